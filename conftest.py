@@ -0,0 +1 @@
+# Keeps the repo root importable when running a bare `pytest`.
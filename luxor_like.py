@@ -11,8 +11,11 @@ Coordinate system:
 from __future__ import annotations
 
 from contextlib import contextmanager
+import functools
 import math
 import random
+import threading
+import warnings
 from typing import Iterable, Optional, Tuple, Union, List
 
 try:
@@ -22,10 +25,22 @@ except Exception:
     _HAS_CAIRO = False
 
 try:
+    import PIL  # type: ignore
     from PIL import Image, ImageDraw, ImageFont  # type: ignore
     _HAS_PIL = True
+    # Pillow-SIMD ships as "<version>.postN" and speeds up the fallback rasterizer.
+    _PIL_SIMD = "post" in PIL.__version__ or hasattr(PIL, "_simd")
 except Exception:
     _HAS_PIL = False
+    _PIL_SIMD = False
+
+_warned_pil_simd = False
+
+try:
+    import numpy as np  # type: ignore
+    _HAS_NUMPY = True
+except Exception:
+    _HAS_NUMPY = False
 
 try:
     from matplotlib.colors import to_rgb  # type: ignore
@@ -34,6 +49,15 @@ except Exception:
     _HAS_MPL_COLORS = False
 
 
+_TWO_PI = 2 * math.pi
+_RAD2DEG = 180.0 / math.pi
+_atan2 = math.atan2
+_hypot = math.hypot
+_cos = math.cos
+_sin = math.sin
+
+O = "O"
+
 Point = Tuple[float, float]
 Color = Union[str, Tuple[float, float, float], Tuple[int, int, int]]
 
@@ -49,30 +73,129 @@ _SIMPLE_COLORS = {
     "gray": (0.5, 0.5, 0.5),
 }
 
-_ctx = {
-    "backend": None,          # "cairo" | "pil" | None
-    "surface": None,          # cairo.ImageSurface | None
-    "ctx": None,              # cairo.Context | PIL.ImageDraw.Draw | None
-    "width": 0,
-    "height": 0,
-    "current_color": (0.0, 0.0, 0.0),
-    "alpha": 1.0,
-    "dash": None,             # None | tuple
-    "line_width": 2.0,
-    "pil_image": None,        # PIL.Image | None
-    "current_point": None,    # for move()
-}
+
+class _State:
+    __slots__ = (
+        "backend",
+        "surface",
+        "ctx",
+        "width",
+        "height",
+        "cx0",
+        "cy0",
+        "current_color",
+        "alpha",
+        "dash",
+        "line_width",
+        "pil_image",
+        "buf",
+        "current_point",
+        "source_dirty",
+        "dash_dirty",
+        "lw_dirty",
+        "pil_rgba",
+        "pil_width",
+        "dirty",
+    )
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.backend = None          # "cairo" | "pil" | None
+        self.surface = None          # cairo.ImageSurface | None
+        self.ctx = None              # cairo.Context | PIL.ImageDraw.Draw | None
+        self.width = 0
+        self.height = 0
+        self.cx0 = 0.0               # canvas center, set once in png()
+        self.cy0 = 0.0
+        self.current_color = (0.0, 0.0, 0.0)
+        self.alpha = 1.0
+        self.dash = None             # None | tuple
+        self.line_width = 2.0
+        self.pil_image = None        # PIL.Image | None
+        self.buf = None              # numpy array backing the cairo surface | None
+        self.current_point = None    # for move()
+        # Cairo state still to be pushed by _sync_cairo() before the next primitive.
+        self.source_dirty = True
+        self.dash_dirty = True
+        self.lw_dirty = True
+        # PIL fill color and stroke width, re-derived only when the state changes.
+        self.pil_rgba = (0, 0, 0, 255)
+        self.pil_width = 2
+        self.dirty = None            # [x0, y0, x1, y1] canvas box drawn since clear_dirty() | None
+
+
+# Drawing state is per thread, so independent `png()` blocks can render concurrently.
+_tls = threading.local()
+
+
+def _state() -> _State:
+    try:
+        return _tls.state
+    except AttributeError:
+        state = _tls.state = _State()
+        return state
 
 
-def _require_ctx() -> None:
-    if _ctx["backend"] is None or _ctx["ctx"] is None:
+def _require_ctx() -> _State:
+    state = _state()
+    if state.backend is None or state.ctx is None:
         raise RuntimeError("Drawing commands must be used inside `with png(...):`")
+    return state
+
+
+def _sync_cairo(state: _State, ctx) -> None:
+    if state.source_dirty:
+        r, g, b = state.current_color
+        ctx.set_source_rgba(r, g, b, state.alpha)
+        state.source_dirty = False
+    if state.dash_dirty:
+        ctx.set_dash(state.dash or [])
+        state.dash_dirty = False
+    if state.lw_dirty:
+        ctx.set_line_width(state.line_width)
+        state.lw_dirty = False
+
+
+def _mark_dirty(state: _State, x0: float, y0: float, x1: float, y1: float) -> None:
+    # Pad by half the stroke plus a pixel of antialiasing.
+    pad = state.line_width * 0.5 + 1.0
+    x0 -= pad
+    y0 -= pad
+    x1 += pad
+    y1 += pad
+    d = state.dirty
+    if d is None:
+        state.dirty = [x0, y0, x1, y1]
+        return
+    if x0 < d[0]:
+        d[0] = x0
+    if y0 < d[1]:
+        d[1] = y0
+    if x1 > d[2]:
+        d[2] = x1
+    if y1 > d[3]:
+        d[3] = y1
+
+
+def _mark_dirty_pts(state: _State, pts, grow: float = 0.0) -> None:
+    if len(pts) == 0:
+        return
+    if _HAS_NUMPY and isinstance(pts, np.ndarray):
+        (x0, y0), (x1, y1) = pts.min(axis=0).tolist(), pts.max(axis=0).tolist()
+    else:
+        xs, ys = zip(*pts)
+        x0, y0, x1, y1 = min(xs), min(ys), max(xs), max(ys)
+    _mark_dirty(state, x0 - grow, y0 - grow, x1 + grow, y1 + grow)
 
 
 def _to_canvas_xy(p: Point) -> Point:
-    x0 = _ctx["width"] / 2
-    y0 = _ctx["height"] / 2
-    return (x0 + p[0], y0 + p[1])
+    state = _state()
+    return (state.cx0 + p[0], state.cy0 + p[1])
+
+
+_BYTE_TO_FLOAT = tuple(i / 255.0 for i in range(256))
 
 
 def _parse_color(col: Optional[Color]) -> Tuple[float, float, float]:
@@ -80,133 +203,255 @@ def _parse_color(col: Optional[Color]) -> Tuple[float, float, float]:
         return (0.0, 0.0, 0.0)
 
     if isinstance(col, (tuple, list)):
-        vals = tuple(col)[:3]
-        if max(vals) > 1:
-            return (vals[0] / 255.0, vals[1] / 255.0, vals[2] / 255.0)
-        return (float(vals[0]), float(vals[1]), float(vals[2]))
+        return _parse_color_tuple(tuple(col))
 
-    s = str(col).strip()
-    if _HAS_MPL_COLORS:
-        try:
-            r, g, b = to_rgb(s)
-            return (float(r), float(g), float(b))
-        except Exception:
-            pass
+    if isinstance(col, str):
+        rgb = _SIMPLE_COLORS.get(col)
+        if rgb is not None:
+            return rgb
+    return _parse_color_str(str(col))
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_color_tuple(col: tuple) -> Tuple[float, float, float]:
+    vals = col[:3]
+    if max(vals) > 1:
+        return (vals[0] / 255.0, vals[1] / 255.0, vals[2] / 255.0)
+    return (float(vals[0]), float(vals[1]), float(vals[2]))
 
+
+@functools.lru_cache(maxsize=512)
+def _parse_color_str(col: str) -> Tuple[float, float, float]:
+    # Local names and hex first; the cache doubles as the parsed-hex memo.
+    s = col.strip()
     key = s.lower()
     if key in _SIMPLE_COLORS:
         return _SIMPLE_COLORS[key]
 
     if key.startswith("#") and len(key) in (4, 7):
         if len(key) == 7:
-            r = int(key[1:3], 16) / 255.0
-            g = int(key[3:5], 16) / 255.0
-            b = int(key[5:7], 16) / 255.0
-            return (r, g, b)
-        r = int(key[1] * 2, 16) / 255.0
-        g = int(key[2] * 2, 16) / 255.0
-        b = int(key[3] * 2, 16) / 255.0
-        return (r, g, b)
+            return (
+                _BYTE_TO_FLOAT[int(key[1:3], 16)],
+                _BYTE_TO_FLOAT[int(key[3:5], 16)],
+                _BYTE_TO_FLOAT[int(key[5:7], 16)],
+            )
+        return (
+            _BYTE_TO_FLOAT[int(key[1] * 2, 16)],
+            _BYTE_TO_FLOAT[int(key[2] * 2, 16)],
+            _BYTE_TO_FLOAT[int(key[3] * 2, 16)],
+        )
+
+    if _HAS_MPL_COLORS:
+        try:
+            r, g, b = to_rgb(s)
+            return (float(r), float(g), float(b))
+        except Exception:
+            pass
 
     return (0.0, 0.0, 0.0)
 
 
+_RGBA_CACHE_SIZE = 256
+_rgba_cache: dict = {}
+
+
 def _pil_rgba(rgb: Tuple[float, float, float], alpha: float) -> Tuple[int, int, int, int]:
-    a = max(0, min(255, int(round(alpha * 255))))
-    return (
-        max(0, min(255, int(round(rgb[0] * 255)))),
-        max(0, min(255, int(round(rgb[1] * 255)))),
-        max(0, min(255, int(round(rgb[2] * 255)))),
-        a,
+    key = (rgb, alpha)
+    rgba = _rgba_cache.get(key)
+    if rgba is not None:
+        return rgba
+
+    # Clamping only runs on a miss; hits skip all of the per-channel work.
+    rgba = (
+        max(0, min(255, int(rgb[0] * 255 + 0.5))),
+        max(0, min(255, int(rgb[1] * 255 + 0.5))),
+        max(0, min(255, int(rgb[2] * 255 + 0.5))),
+        max(0, min(255, int(alpha * 255 + 0.5))),
     )
+    if len(_rgba_cache) >= _RGBA_CACHE_SIZE:
+        _rgba_cache.clear()
+    _rgba_cache[key] = rgba
+    return rgba
 
 
 @contextmanager
-def png(path: str, width: int, height: int):
+def png(path: Optional[str], width: int, height: int):
+    """
+    Drawing canvas of `width` x `height`, written to `path` on exit.
+
+    Pass `path=None` to skip the PNG encode, e.g. when only `get_buffer()` is needed.
+    """
+    global _warned_pil_simd
+    state = _state()
     if _HAS_CAIRO:
-        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        if _HAS_NUMPY:
+            buf = np.zeros((height, width, 4), dtype=np.uint8)
+            surface = cairo.ImageSurface.create_for_data(
+                buf, cairo.FORMAT_ARGB32, width, height, width * 4
+            )
+        else:
+            buf = None
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
         ctx = cairo.Context(surface)
         ctx.set_source_rgb(1, 1, 1)
         ctx.paint()
-        _ctx.update(
-            backend="cairo",
-            surface=surface,
-            ctx=ctx,
-            width=width,
-            height=height,
-            current_color=(0.0, 0.0, 0.0),
-            alpha=1.0,
-            dash=None,
-            line_width=2.0,
-            pil_image=None,
-            current_point=None,
-        )
+        ctx.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+        state.reset()
+        state.backend = "cairo"
+        state.surface = surface
+        state.ctx = ctx
+        state.buf = buf
     elif _HAS_PIL:
+        if not _PIL_SIMD and not _warned_pil_simd:
+            _warned_pil_simd = True
+            warnings.warn("Install pillow-simd for ~2x rasterization speed", stacklevel=3)
         img = Image.new("RGBA", (width, height), (255, 255, 255, 255))
         draw = ImageDraw.Draw(img, "RGBA")
-        _ctx.update(
-            backend="pil",
-            surface=None,
-            ctx=draw,
-            width=width,
-            height=height,
-            current_color=(0.0, 0.0, 0.0),
-            alpha=1.0,
-            dash=None,
-            line_width=2.0,
-            pil_image=img,
-            current_point=None,
-        )
+        state.reset()
+        state.backend = "pil"
+        state.ctx = draw
+        state.pil_image = img
     else:
         raise RuntimeError("No supported backend. Install 'pycairo' or 'Pillow'.")
 
+    state.width = width
+    state.height = height
+    state.cx0 = width * 0.5
+    state.cy0 = height * 0.5
+
     try:
         yield
-        if _ctx["backend"] == "cairo":
-            _ctx["surface"].write_to_png(path)
-        else:
-            _ctx["pil_image"].save(path, "PNG")
+        if path is not None:
+            if state.backend == "cairo":
+                state.surface.write_to_png(path)
+            else:
+                state.pil_image.save(path, "PNG")
     finally:
-        _ctx.update(
-            backend=None,
-            surface=None,
-            ctx=None,
-            width=0,
-            height=0,
-            current_color=(0.0, 0.0, 0.0),
-            alpha=1.0,
-            dash=None,
-            line_width=2.0,
-            pil_image=None,
-            current_point=None,
-        )
+        state.reset()
+
+
+def get_buffer() -> "np.ndarray":
+    """
+    Pixels of the current canvas as a (height, width, 4) uint8 array.
+
+    With cairo this is the surface's own memory (premultiplied BGRA on
+    little-endian machines), so it reflects every draw without a copy.
+    With the Pillow fallback it is an RGBA copy of the image.
+    """
+    state = _require_ctx()
+    if not _HAS_NUMPY:
+        raise RuntimeError("get_buffer() requires numpy. Install 'numpy'.")
+    if state.backend == "cairo":
+        state.surface.flush()
+        return state.buf
+    return np.asarray(state.pil_image)
+
+
+def get_dirty_rect() -> Optional[Tuple[int, int, int, int]]:
+    """
+    Pixel box (left, top, right, bottom) drawn on since `png()` or the last
+    `clear_dirty()`, clamped to the canvas, or None if nothing was drawn.
+
+    The box is conservative and can be passed straight to PIL's `Image.crop()`.
+    """
+    state = _require_ctx()
+    d = state.dirty
+    if d is None:
+        return None
+    left = max(0, math.floor(d[0]))
+    top = max(0, math.floor(d[1]))
+    right = min(state.width, math.ceil(d[2]))
+    bottom = min(state.height, math.ceil(d[3]))
+    if left >= right or top >= bottom:
+        return None
+    return (left, top, right, bottom)
+
+
+def clear_dirty() -> None:
+    state = _require_ctx()
+    state.dirty = None
+
+
+class Motif:
+    """Drawing commands captured by `record()`, replayed with `draw_at()`."""
+
+    __slots__ = ("surface", "extents")
+
+    def __init__(self, surface) -> None:
+        self.surface = surface
+        self.extents = None          # cached ink_extents(); computing them replays the recording
+
+    def draw_at(self, pos: Union[str, Point] = O) -> None:
+        state = _require_ctx()
+        x, y = (state.cx0, state.cy0) if pos == "O" else _to_canvas_xy(pos)
+        if self.extents is None:
+            self.extents = self.surface.ink_extents()
+        ix, iy, iw, ih = self.extents
+        _mark_dirty(state, x + ix, y + iy, x + ix + iw, y + iy + ih)
+        ctx = state.ctx
+        ctx.set_source_surface(self.surface, x, y)
+        ctx.paint()
+        state.source_dirty = True
+
+
+@contextmanager
+def record():
+    """
+    Capture drawing commands into a `Motif` instead of the canvas.
+
+    Points inside the block are relative to the motif's own origin, which
+    `Motif.draw_at(pos)` places at `pos`. Requires the cairo backend.
+    """
+    if not _HAS_CAIRO:
+        raise RuntimeError("record() requires the cairo backend. Install 'pycairo'.")
+
+    state = _state()
+    saved = tuple(getattr(state, name) for name in _State.__slots__)
+    surface = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None)
+    state.backend = "cairo"
+    state.surface = surface
+    state.ctx = ctx = cairo.Context(surface)
+    ctx.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+    state.cx0 = 0.0
+    state.cy0 = 0.0
+    state.source_dirty = True
+    state.dash_dirty = True
+    state.lw_dirty = True
+    # Motif coordinates are not canvas pixels; the saved box comes back on exit.
+    state.dirty = None
+    try:
+        yield Motif(surface)
+    finally:
+        for name, value in zip(_State.__slots__, saved):
+            setattr(state, name, value)
 
 
 def sethue(color: Color) -> None:
-    _require_ctx()
-    _ctx["current_color"] = _parse_color(color)
-    if _ctx["backend"] == "cairo":
-        r, g, b = _ctx["current_color"]
-        _ctx["ctx"].set_source_rgba(r, g, b, _ctx["alpha"])
+    state = _require_ctx()
+    state.current_color = _parse_color(color)
+    state.source_dirty = True
+    if state.backend == "pil":
+        state.pil_rgba = _pil_rgba(state.current_color, state.alpha)
 
 
 def setopacity(alpha: float) -> None:
-    _require_ctx()
-    _ctx["alpha"] = float(max(0.0, min(1.0, alpha)))
-    if _ctx["backend"] == "cairo":
-        r, g, b = _ctx["current_color"]
-        _ctx["ctx"].set_source_rgba(r, g, b, _ctx["alpha"])
+    state = _require_ctx()
+    state.alpha = float(max(0.0, min(1.0, alpha)))
+    state.source_dirty = True
+    if state.backend == "pil":
+        state.pil_rgba = _pil_rgba(state.current_color, state.alpha)
 
 
 def setlinewidth(w: float) -> None:
-    _require_ctx()
-    _ctx["line_width"] = float(max(0.1, w))
-    if _ctx["backend"] == "cairo":
-        _ctx["ctx"].set_line_width(_ctx["line_width"])
+    state = _require_ctx()
+    state.line_width = float(max(0.1, w))
+    state.lw_dirty = True
+    if state.backend == "pil":
+        state.pil_width = int(round(state.line_width))
 
 
 def setdash(style: Optional[Union[str, Iterable[float]]]) -> None:
-    _require_ctx()
+    state = _require_ctx()
     if style in (None, "solid"):
         dash = None
     elif style == "dot":
@@ -214,20 +459,20 @@ def setdash(style: Optional[Union[str, Iterable[float]]]) -> None:
     elif style == "dash":
         dash = (6.0, 4.0)
     elif isinstance(style, (tuple, list)):
-        dash = tuple(float(x) for x in style)
+        dash = tuple(map(float, style))
     else:
         raise ValueError(f"Unknown dash style: {style!r}")
 
-    _ctx["dash"] = dash
-    if _ctx["backend"] == "cairo":
-        _ctx["ctx"].set_dash(dash or [])
+    state.dash = dash
+    state.dash_dirty = True
 
 
 def background(color: Color) -> None:
-    _require_ctx()
+    state = _require_ctx()
     rgb = _parse_color(color)
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
+    state.dirty = [0, 0, state.width, state.height]
+    if state.backend == "cairo":
+        ctx = state.ctx
         ctx.save()
         ctx.set_source_rgb(*rgb)
         ctx.paint()
@@ -235,190 +480,305 @@ def background(color: Color) -> None:
         return
 
     fill = _pil_rgba(rgb, 1.0)
-    _ctx["ctx"].rectangle([0, 0, _ctx["width"], _ctx["height"]], fill=fill)
+    state.ctx.rectangle([0, 0, state.width, state.height], fill=fill)
 
 
 def circle(center: Union[str, Point], radius: float, stroke: bool = False, fill: bool = False) -> None:
-    _require_ctx()
+    state = _require_ctx()
     if center == "O":
-        cx, cy = _ctx["width"] / 2, _ctx["height"] / 2
+        cx, cy = state.cx0, state.cy0
     else:
-        cx, cy = _to_canvas_xy(center)
+        cx, cy = state.cx0 + center[0], state.cy0 + center[1]
+    _mark_dirty(state, cx - radius, cy - radius, cx + radius, cy + radius)
 
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.new_path()
-        ctx.arc(cx, cy, radius, 0, 2 * math.pi)
-        ctx.set_dash(_ctx["dash"] or [])
-        ctx.set_line_width(_ctx["line_width"])
-        r, g, b = _ctx["current_color"]
-        ctx.set_source_rgba(r, g, b, _ctx["alpha"])
+        ctx.arc(cx, cy, radius, 0, _TWO_PI)
         if fill:
             ctx.fill_preserve()
         if stroke:
             ctx.stroke()
-        ctx.restore()
         return
 
-    draw = _ctx["ctx"]
-    rgb = _ctx["current_color"]
     box = [cx - radius, cy - radius, cx + radius, cy + radius]
     if fill:
-        draw.ellipse(box, fill=_pil_rgba(rgb, _ctx["alpha"]))
+        ctx.ellipse(box, fill=state.pil_rgba)
     if stroke:
-        draw.ellipse(box, outline=_pil_rgba(rgb, _ctx["alpha"]), width=int(round(_ctx["line_width"])))
+        ctx.ellipse(box, outline=state.pil_rgba, width=state.pil_width)
 
 
 def rect(center: Union[str, Point], w: float, h: float, stroke: bool = False, fill: bool = False) -> None:
-    _require_ctx()
+    state = _require_ctx()
     if center == "O":
-        cx, cy = _ctx["width"] / 2, _ctx["height"] / 2
+        cx, cy = state.cx0, state.cy0
     else:
-        cx, cy = _to_canvas_xy(center)
+        cx, cy = state.cx0 + center[0], state.cy0 + center[1]
 
     x1, y1 = cx - w / 2, cy - h / 2
     x2, y2 = cx + w / 2, cy + h / 2
+    _mark_dirty(state, x1, y1, x2, y2)
 
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.new_path()
         ctx.rectangle(x1, y1, w, h)
-        ctx.set_dash(_ctx["dash"] or [])
-        ctx.set_line_width(_ctx["line_width"])
-        r, g, b = _ctx["current_color"]
-        ctx.set_source_rgba(r, g, b, _ctx["alpha"])
         if fill:
             ctx.fill_preserve()
         if stroke:
             ctx.stroke()
-        ctx.restore()
         return
 
-    draw = _ctx["ctx"]
-    rgba = _pil_rgba(_ctx["current_color"], _ctx["alpha"])
+    rgba = state.pil_rgba
     if fill:
-        draw.rectangle([x1, y1, x2, y2], fill=rgba)
+        ctx.rectangle([x1, y1, x2, y2], fill=rgba)
     if stroke:
-        draw.rectangle([x1, y1, x2, y2], outline=rgba, width=int(round(_ctx["line_width"])))
+        ctx.rectangle([x1, y1, x2, y2], outline=rgba, width=state.pil_width)
 
 
 def line(p1: Point, p2: Point) -> None:
-    _require_ctx()
-    x1, y1 = _to_canvas_xy(p1)
-    x2, y2 = _to_canvas_xy(p2)
-
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
+    state = _require_ctx()
+    cx0, cy0 = state.cx0, state.cy0
+    x1, y1 = cx0 + p1[0], cy0 + p1[1]
+    x2, y2 = cx0 + p2[0], cy0 + p2[1]
+    _mark_dirty(state, min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.new_path()
         ctx.move_to(x1, y1)
         ctx.line_to(x2, y2)
-        ctx.set_dash(_ctx["dash"] or [])
-        ctx.set_line_width(_ctx["line_width"])
-        r, g, b = _ctx["current_color"]
-        ctx.set_source_rgba(r, g, b, _ctx["alpha"])
         ctx.stroke()
-        ctx.restore()
         return
 
-    draw = _ctx["ctx"]
-    draw.line([(x1, y1), (x2, y2)], fill=_pil_rgba(_ctx["current_color"], _ctx["alpha"]), width=int(round(_ctx["line_width"])))
+    ctx.line([(x1, y1), (x2, y2)], fill=state.pil_rgba, width=state.pil_width)
 
 
-def bezier(p0: Point, p1: Point, p2: Point, p3: Point) -> None:
-    _require_ctx()
-    x0, y0 = _to_canvas_xy(p0)
-    x1, y1 = _to_canvas_xy(p1)
-    x2, y2 = _to_canvas_xy(p2)
-    x3, y3 = _to_canvas_xy(p3)
+def _to_canvas_xy_arr(pts) -> "np.ndarray":
+    """(n, 2) array of canvas coordinates, translated in one broadcast add."""
+    state = _state()
+    if not isinstance(pts, np.ndarray):
+        pts = list(pts)
+    arr = np.asarray(pts, dtype=np.float64)
+    if arr.size == 0:
+        return arr.reshape(0, 2)
+    if arr.ndim != 2 or arr.shape[1] < 2:
+        raise ValueError(f"Expected a sequence of (x, y) points, got shape {arr.shape}")
+    return arr[:, :2] + (state.cx0, state.cy0)
 
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
+
+def polyline(pts: Iterable[Point], close: bool = False) -> None:
+    """
+    Stroke connected segments through `pts` in a single path.
+    """
+    state = _require_ctx()
+    if _HAS_NUMPY:
+        arr = _to_canvas_xy_arr(pts)
+        xy = arr.tolist()
+    else:
+        cx0, cy0 = state.cx0, state.cy0
+        arr = xy = [(cx0 + p[0], cy0 + p[1]) for p in pts]
+    if len(xy) < 2:
+        return
+    _mark_dirty_pts(state, arr)
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
+        ctx.new_path()
+        ctx.move_to(*xy[0])
+        for x, y in xy[1:]:
+            ctx.line_to(x, y)
+        if close:
+            ctx.close_path()
+        ctx.stroke()
+        return
+
+    if close:
+        xy.append(xy[0])
+    ctx.line(xy, fill=state.pil_rgba, width=state.pil_width)
+
+
+def points(pts: Iterable[Point], radius: float = 2.0) -> None:
+    """
+    Filled dots of `radius` at each of `pts`, filled in a single pass.
+    """
+    state = _require_ctx()
+    if _HAS_NUMPY:
+        arr = _to_canvas_xy_arr(pts)
+        xy = arr.tolist()
+    else:
+        cx0, cy0 = state.cx0, state.cy0
+        arr = xy = [(cx0 + p[0], cy0 + p[1]) for p in pts]
+    _mark_dirty_pts(state, arr, radius)
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
+        ctx.new_path()
+        for x, y in xy:
+            ctx.new_sub_path()
+            ctx.arc(x, y, radius, 0, _TWO_PI)
+        ctx.fill()
+        return
+
+    rgba = state.pil_rgba
+    for x, y in xy:
+        ctx.ellipse([x - radius, y - radius, x + radius, y + radius], fill=rgba)
+
+
+def scatter(xs: Iterable[float], ys: Iterable[float], r: float, fill: bool = True) -> None:
+    """
+    Circles of radius `r` at (xs[i], ys[i]), filled (or stroked) in one pass.
+    """
+    state = _require_ctx()
+    cx0, cy0 = state.cx0, state.cy0
+    if _HAS_NUMPY:
+        if not hasattr(xs, "__len__"):
+            xs = list(xs)
+        if not hasattr(ys, "__len__"):
+            ys = list(ys)
+        cxs = np.asarray(xs, dtype=np.float64).ravel() + cx0
+        cys = np.asarray(ys, dtype=np.float64).ravel() + cy0
+    else:
+        cxs = [cx0 + x for x in xs]
+        cys = [cy0 + y for y in ys]
+    if len(cxs) != len(cys):
+        raise ValueError(f"scatter() got {len(cxs)} xs but {len(cys)} ys")
+    if len(cxs):
+        if _HAS_NUMPY:
+            _mark_dirty(state, cxs.min() - r, cys.min() - r, cxs.max() + r, cys.max() + r)
+        else:
+            _mark_dirty(state, min(cxs) - r, min(cys) - r, max(cxs) + r, max(cys) + r)
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        if _HAS_NUMPY:
+            cxs, cys = cxs.tolist(), cys.tolist()
+        _sync_cairo(state, ctx)
+        ctx.new_path()
+        for x, y in zip(cxs, cys):
+            ctx.new_sub_path()
+            ctx.arc(x, y, r, 0, _TWO_PI)
+        if fill:
+            ctx.fill()
+        else:
+            ctx.stroke()
+        return
+
+    if _HAS_NUMPY:
+        boxes = np.column_stack((cxs - r, cys - r, cxs + r, cys + r)).tolist()
+    else:
+        boxes = [[x - r, y - r, x + r, y + r] for x, y in zip(cxs, cys)]
+    rgba = state.pil_rgba
+    if fill:
+        for box in boxes:
+            ctx.ellipse(box, fill=rgba)
+    else:
+        width = state.pil_width
+        for box in boxes:
+            ctx.ellipse(box, outline=rgba, width=width)
+
+
+@functools.lru_cache(maxsize=8)
+def _bezier_weights(steps: int):
+    """(steps + 1, 4) Bernstein weights of a cubic Bezier, one row per sample."""
+    t = np.linspace(0.0, 1.0, steps + 1)
+    mt = 1.0 - t
+    return np.stack((mt * mt * mt, 3.0 * mt * mt * t, 3.0 * mt * t * t, t * t * t), axis=1)
+
+
+def bezier(p0: Point, p1: Point, p2: Point, p3: Point) -> None:
+    state = _require_ctx()
+    cx0, cy0 = state.cx0, state.cy0
+    x0, y0 = cx0 + p0[0], cy0 + p0[1]
+    x1, y1 = cx0 + p1[0], cy0 + p1[1]
+    x2, y2 = cx0 + p2[0], cy0 + p2[1]
+    x3, y3 = cx0 + p3[0], cy0 + p3[1]
+    # The curve stays inside the hull of its control points.
+    _mark_dirty(state, min(x0, x1, x2, x3), min(y0, y1, y2, y3), max(x0, x1, x2, x3), max(y0, y1, y2, y3))
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.new_path()
         ctx.move_to(x0, y0)
         ctx.curve_to(x1, y1, x2, y2, x3, y3)
-        ctx.set_dash(_ctx["dash"] or [])
-        ctx.set_line_width(_ctx["line_width"])
-        r, g, b = _ctx["current_color"]
-        ctx.set_source_rgba(r, g, b, _ctx["alpha"])
         ctx.stroke()
-        ctx.restore()
         return
 
     # PIL fallback: polyline approximation
     steps = 60
-    pts: List[Tuple[float, float]] = []
-    for i in range(steps + 1):
-        t = i / steps
-        mt = 1 - t
-        bx = (
-            mt**3 * x0
-            + 3 * mt**2 * t * x1
-            + 3 * mt * t**2 * x2
-            + t**3 * x3
-        )
-        by = (
-            mt**3 * y0
-            + 3 * mt**2 * t * y1
-            + 3 * mt * t**2 * y2
-            + t**3 * y3
-        )
-        pts.append((bx, by))
+    if _HAS_NUMPY:
+        ctrl = np.array(((x0, y0), (x1, y1), (x2, y2), (x3, y3)))
+        pts = (_bezier_weights(steps) @ ctrl).tolist()
+    else:
+        pts: List[Tuple[float, float]] = []
+        for i in range(steps + 1):
+            t = i / steps
+            mt = 1 - t
+            bx = (
+                mt**3 * x0
+                + 3 * mt**2 * t * x1
+                + 3 * mt * t**2 * x2
+                + t**3 * x3
+            )
+            by = (
+                mt**3 * y0
+                + 3 * mt**2 * t * y1
+                + 3 * mt * t**2 * y2
+                + t**3 * y3
+            )
+            pts.append((bx, by))
+
+    ctx.line(pts, fill=state.pil_rgba, width=state.pil_width)
+
+
+# Label offsets as (dx, dy) multiples of the text (width, height). Cairo places
+# text by its baseline and PIL by its top edge, hence the flipped y factors.
+_ANCHOR_CAIRO = {"N": (-0.5, 1.0), "S": (-0.5, 0.0), "E": (-1.0, 0.0), "W": (0.0, 0.0), "C": (-0.5, 0.5)}
+_ANCHOR_PIL = {"N": (-0.5, -1.0), "S": (-0.5, 0.0), "E": (-1.0, 0.0), "W": (0.0, 0.0), "C": (-0.5, -0.5)}
 
-    draw = _ctx["ctx"]
-    draw.line(pts, fill=_pil_rgba(_ctx["current_color"], _ctx["alpha"]), width=int(round(_ctx["line_width"])))
+
+@functools.lru_cache(maxsize=1)
+def _pil_default_font():
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=256)
+def _pil_text_bbox(text: str) -> Tuple[int, int, int, int]:
+    return _pil_default_font().getbbox(text)
 
 
 def label(text: str, anchor: str, pos: Point, fontsize: int = 16) -> None:
-    _require_ctx()
-    x, y = _to_canvas_xy(pos)
+    state = _require_ctx()
+    x, y = state.cx0 + pos[0], state.cy0 + pos[1]
 
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
-        r, g, b = _ctx["current_color"]
-        ctx.set_source_rgba(r, g, b, _ctx["alpha"])
-        ctx.select_font_face("Sans", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.set_font_size(fontsize)
         xb, yb, w, h, xa, ya = ctx.text_extents(text)
-
-        if anchor == "N":
-            x -= w / 2
-            y += h
-        elif anchor == "S":
-            x -= w / 2
-        elif anchor == "E":
-            x -= w
-        elif anchor == "C":
-            x -= w / 2
-            y += h / 2
-
+        fx, fy = _ANCHOR_CAIRO.get(anchor, (0.0, 0.0))
+        x += fx * w
+        y += fy * h
+        _mark_dirty(state, x + xb, y + yb, x + xb + w, y + yb + h)
         ctx.move_to(x, y)
         ctx.show_text(text)
-        ctx.restore()
         return
 
-    draw = _ctx["ctx"]
-    font = ImageFont.load_default()
-    bbox = font.getbbox(text)
+    font = _pil_default_font()
+    bbox = _pil_text_bbox(text)
     w = bbox[2] - bbox[0]
     h = bbox[3] - bbox[1]
-
-    if anchor == "N":
-        x -= w / 2
-        y -= h
-    elif anchor == "S":
-        x -= w / 2
-    elif anchor == "E":
-        x -= w
-    elif anchor == "C":
-        x -= w / 2
-        y -= h / 2
-
-    draw.text((x, y), text, fill=_pil_rgba(_ctx["current_color"], _ctx["alpha"]), font=font)
+    fx, fy = _ANCHOR_PIL.get(anchor, (0.0, 0.0))
+    x += fx * w
+    y += fy * h
+    _mark_dirty(state, x + bbox[0], y + bbox[1], x + bbox[2], y + bbox[3])
+    ctx.text((x, y), text, fill=state.pil_rgba, font=font)
 
 
 def label_angle( 
@@ -429,8 +789,8 @@ def label_angle(
     fontsize: int = 16, 
  ) -> None: 
     _require_ctx()
-    dx = offset * math.cos(angle) 
-    dy = offset * math.sin(angle) 
+    dx = offset * _cos(angle) 
+    dy = offset * _sin(angle) 
     label(text, "C", (pos[0] + dx, pos[1] + dy), fontsize=fontsize)
 
 
@@ -440,63 +800,62 @@ def randomhue() -> None:
 
 
 def move(p: Point) -> None:
-    _require_ctx()
-    _ctx["current_point"] = p
-
+    state = _require_ctx()
+    state.current_point = p
 
-def arc2r(center: Union[str, Point], p_from: Point, p_to: Point) -> None:
-    """
-    Circular arc around `center` from p_from to p_to (minor arc).
-    """
-    _require_ctx()
 
-    c = (0.0, 0.0) if center == "O" else center
+@functools.lru_cache(maxsize=256)
+def _arc_geometry(c: Point, p_from: Point, p_to: Point) -> Tuple[float, float, float]:
+    """Radius and start/end angles of the minor arc around `c`."""
     fx, fy = (p_from[0] - c[0], p_from[1] - c[1])
     tx, ty = (p_to[0] - c[0], p_to[1] - c[1])
 
-    r = math.hypot(fx, fy)
-    a1 = math.atan2(fy, fx)
-    a2 = math.atan2(ty, tx)
+    r = _hypot(fx, fy)
+    a1 = _atan2(fy, fx)
+    a2 = _atan2(ty, tx)
 
-    da = a2 - a1
-    while da <= 0:
-        da += 2 * math.pi
+    # Float % is non-negative, so da lands in [0, 2pi) without looping.
+    da = (a2 - a1) % _TWO_PI
     if da > math.pi:
         a1, a2 = a2, a1
-        da = a2 - a1
-        while da <= 0:
-            da += 2 * math.pi
+    return (r, a1, a2)
 
-    cx, cy = _to_canvas_xy(c)
 
-    if _ctx["backend"] == "cairo":
-        ctx = _ctx["ctx"]
-        ctx.save()
+def arc2r(center: Union[str, Point], p_from: Point, p_to: Point) -> None:
+    """
+    Circular arc around `center` from p_from to p_to (minor arc).
+    """
+    state = _require_ctx()
+
+    c = (0.0, 0.0) if center == "O" else tuple(center)
+    r, a1, a2 = _arc_geometry(c, tuple(p_from), tuple(p_to))
+
+    cx, cy = state.cx0 + c[0], state.cy0 + c[1]
+    _mark_dirty(state, cx - r, cy - r, cx + r, cy + r)
+
+    ctx = state.ctx
+    if state.backend == "cairo":
+        _sync_cairo(state, ctx)
         ctx.new_path()
         ctx.arc(cx, cy, r, a1, a2)
-        ctx.set_dash(_ctx["dash"] or [])
-        ctx.set_line_width(_ctx["line_width"])
-        r0, g0, b0 = _ctx["current_color"]
-        ctx.set_source_rgba(r0, g0, b0, _ctx["alpha"])
         ctx.stroke()
-        ctx.restore()
         return
 
-    draw = _ctx["ctx"]
     box = [cx - r, cy - r, cx + r, cy + r]
-    draw.arc(
+    ctx.arc(
         box,
-        start=math.degrees(a1),
-        end=math.degrees(a2),
-        fill=_pil_rgba(_ctx["current_color"], _ctx["alpha"]),
-        width=int(round(_ctx["line_width"])),
+        start=a1 * _RAD2DEG,
+        end=a2 * _RAD2DEG,
+        fill=state.pil_rgba,
+        width=state.pil_width,
     )
 
 
-O = "O"
-
 __all__ = [
     "png",
+    "get_buffer",
+    "get_dirty_rect",
+    "clear_dirty",
     "background",
     "sethue",
     "setopacity",
@@ -505,12 +864,17 @@ __all__ = [
     "circle",
     "rect",
     "line",
+    "polyline",
+    "points",
+    "scatter",
     "bezier",
     "label",
     "label_angle",
     "randomhue",
     "move",
     "arc2r",
+    "record",
+    "Motif",
     "O",
 ]
 
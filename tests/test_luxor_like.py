@@ -0,0 +1,192 @@
+import types
+
+import pytest
+
+import luxor_like as L
+
+
+@pytest.fixture
+def pil_backend(monkeypatch):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(L, "_HAS_CAIRO", False)
+    monkeypatch.setattr(L, "_warned_pil_simd", True)
+
+
+@pytest.fixture(params=[False, True], ids=["lists", "numpy"])
+def numpy_mode(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(L, "_HAS_NUMPY", request.param)
+    return request.param
+
+
+def _render(tmp_path, draw, size=60):
+    from PIL import Image
+
+    path = tmp_path / "out.png"
+    with L.png(str(path), size, size):
+        draw()
+    with Image.open(path) as img:
+        return img.convert("RGBA")
+
+
+def _is_blank(img):
+    return img.getextrema() == ((255, 255),) * 4
+
+
+def test_polyline_close_adds_closing_segment(tmp_path, pil_backend, numpy_mode):
+    pts = [(-20, -20), (20, -20), (20, 20)]
+    opened = _render(tmp_path, lambda: L.polyline(pts))
+    closed = _render(tmp_path, lambda: L.polyline(pts, close=True))
+    # The closing segment runs back through the canvas center.
+    assert opened.getpixel((30, 30)) == (255, 255, 255, 255)
+    assert closed.getpixel((30, 30))[:3] == (0, 0, 0)
+
+
+def test_polyline_with_fewer_than_two_points_draws_nothing(tmp_path, pil_backend, numpy_mode):
+    assert _is_blank(_render(tmp_path, lambda: L.polyline([(0, 0)])))
+    assert _is_blank(_render(tmp_path, lambda: L.polyline([])))
+
+
+def test_points_with_no_points_draws_nothing(tmp_path, pil_backend, numpy_mode):
+    assert _is_blank(_render(tmp_path, lambda: L.points([])))
+
+
+@pytest.mark.parametrize("fn", [L.polyline, L.points], ids=["polyline", "points"])
+def test_generator_input_matches_list_input(tmp_path, pil_backend, numpy_mode, fn):
+    pts = [(-20, 10), (0, -15), (25, 5)]
+    expected = _render(tmp_path, lambda: fn(pts))
+    got = _render(tmp_path, lambda: fn(p for p in pts))
+    assert not _is_blank(got)
+    assert got.tobytes() == expected.tobytes()
+
+
+def test_polyline_uses_only_xy_of_each_point(tmp_path, pil_backend, numpy_mode):
+    expected = _render(tmp_path, lambda: L.line((-20, -10), (20, 15)))
+    got = _render(tmp_path, lambda: L.polyline([(-20, -10, 99), (20, 15, 99)]))
+    assert got.tobytes() == expected.tobytes()
+
+
+class _FakeCairoObject:
+    """Accepts any cairo call; just enough for the drawing functions."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _FakeImageSurface(_FakeCairoObject):
+    @classmethod
+    def create_for_data(cls, *args):
+        return cls()
+
+
+class _FakeRecordingSurface(_FakeCairoObject):
+    def __init__(self, *args, **kwargs):
+        self.ink_extents_calls = 0
+
+    def ink_extents(self):
+        self.ink_extents_calls += 1
+        return (-4.0, -4.0, 8.0, 8.0)
+
+
+@pytest.fixture
+def fake_cairo(monkeypatch):
+    cairo = types.SimpleNamespace(
+        FORMAT_ARGB32=0,
+        CONTENT_COLOR_ALPHA=0x3000,
+        FONT_SLANT_NORMAL=0,
+        FONT_WEIGHT_NORMAL=0,
+        ImageSurface=_FakeImageSurface,
+        RecordingSurface=_FakeRecordingSurface,
+        Context=_FakeCairoObject,
+    )
+    monkeypatch.setattr(L, "cairo", cairo, raising=False)
+    monkeypatch.setattr(L, "_HAS_CAIRO", True)
+    return cairo
+
+
+@pytest.mark.parametrize("backend", ["pil_backend", "fake_cairo"])
+def test_scatter_rejects_mismatched_lengths(tmp_path, request, numpy_mode, backend):
+    request.getfixturevalue(backend)
+    with L.png(str(tmp_path / "out.png"), 60, 60):
+        with pytest.raises(ValueError):
+            L.scatter([0, 1, 2], [0, 1], 3)
+
+
+def test_png_without_path_writes_nothing(tmp_path, monkeypatch, pil_backend):
+    monkeypatch.chdir(tmp_path)
+    with L.png(None, 20, 10):
+        L.circle(L.O, 3, fill=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_buffer_reflects_drawing(pil_backend):
+    np = pytest.importorskip("numpy")
+    with L.png(None, 20, 10):
+        L.sethue("red")
+        L.rect(L.O, 6, 6, fill=True)
+        buf = L.get_buffer()
+    assert buf.shape == (10, 20, 4)
+    assert buf.dtype == np.uint8
+    assert buf[5, 10].tolist() == [255, 0, 0, 255]
+
+
+def test_get_buffer_requires_numpy(pil_backend, monkeypatch):
+    monkeypatch.setattr(L, "_HAS_NUMPY", False)
+    with L.png(None, 20, 10):
+        with pytest.raises(RuntimeError):
+            L.get_buffer()
+
+
+def _dirty_after(draw, size=100):
+    with L.png(None, size, size):
+        draw()
+        return L.get_dirty_rect()
+
+
+def test_dirty_rect_is_union_of_primitives(pil_backend):
+    def draw():
+        L.circle((-20, -20), 5, fill=True)
+        L.circle((20, 20), 5, fill=True)
+
+    # Each box is padded by half the default line width plus one pixel.
+    assert _dirty_after(draw) == (23, 23, 77, 77)
+
+
+def test_dirty_rect_is_clamped_to_canvas(pil_backend):
+    assert _dirty_after(lambda: L.circle((45, 45), 20, fill=True)) == (73, 73, 100, 100)
+
+
+def test_background_marks_whole_canvas(pil_backend):
+    assert _dirty_after(lambda: L.background("gray")) == (0, 0, 100, 100)
+
+
+def test_clear_dirty_resets_to_none(pil_backend):
+    with L.png(None, 100, 100):
+        assert L.get_dirty_rect() is None
+        L.line((-10, 0), (10, 0))
+        assert L.get_dirty_rect() is not None
+        L.clear_dirty()
+        assert L.get_dirty_rect() is None
+
+
+def test_record_does_not_leak_into_dirty_rect(fake_cairo):
+    with L.png(None, 400, 400):
+        L.circle((150, 150), 5, fill=True)
+        before = L.get_dirty_rect()
+        with L.record():
+            L.circle(L.O, 4, fill=True)
+        assert L.get_dirty_rect() == before
+
+
+def test_draw_at_computes_ink_extents_once(fake_cairo):
+    with L.record() as motif:
+        L.circle(L.O, 4, fill=True)
+    with L.png(None, 100, 100):
+        motif.draw_at((10, 10))
+        motif.draw_at((-10, -10))
+        assert L.get_dirty_rect() == (34, 34, 66, 66)
+    assert motif.surface.ink_extents_calls == 1